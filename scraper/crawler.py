@@ -1,40 +1,70 @@
 import asyncio
+import concurrent.futures
 import contextlib
+import itertools
+import logging
+import multiprocessing
+import os
 import re
+import time
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
-from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
-from urllib.parse import urlparse
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 
 import httpx
+from protego import Protego
 
-from .extractors import (
-    extract_image_sources,
-    extract_links,
-    extract_metadata,
-    extract_pagination_next_links,
-    extract_structured_data,
-    extract_text_content,
-)
+from .extractors import extract_page
 from .storage import StorageManager
 from .utils import (
+    cached_urlparse,
     guess_filename_for_url,
-    is_allowed_domain,
-    normalize_url,
-    should_render_heuristic,
+    is_allowed_netloc,
+    normalize_allowed_url,
+    robots_rule_prefix_len,
 )
 
 
+logger = logging.getLogger(__name__)
+
+# robots.txt cache bounds; unreachable robots.txt is retried after a short TTL
+ROBOTS_CACHE_SIZE = 1024
+ROBOTS_FAILURE_TTL_S = 300.0
+ROBOTS_DECISION_CACHE_SIZE = 16384
+# Upper bound on a robots.txt Crawl-delay; the directive itself has none
+MAX_CRAWL_DELAY_S = 60.0
+
+# Images are streamed to disk in chunks of this size
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+
+def _new_parse_pool(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    # Don't fork the running event loop, open sockets and threads into the
+    # workers; forkserver/spawn start them from a clean interpreter
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context(method)
+    )
+
+
 @dataclass
 class CrawlTask:
+    __slots__ = ("url", "depth")
+
     url: str
     depth: int
 
 
 class PlaywrightManager:
-    def __init__(self) -> None:
+    def __init__(self, max_contexts: int = 4) -> None:
         self._playwright = None
         self._browser = None
         self._lock = asyncio.Lock()
+        # Browser contexts are expensive to create, so reuse idle ones and
+        # open a fresh page per render; at most max_contexts exist at once
+        self._context_slots = asyncio.Semaphore(max(1, max_contexts))
+        self._idle_contexts: List[Any] = []
 
     async def ensure_browser(self):
         async with self._lock:
@@ -52,14 +82,23 @@ class PlaywrightManager:
             await self.ensure_browser()
         assert self._playwright is not None
         assert self._browser is not None
-        context = await self._browser.new_context()
-        page = await context.new_page()
-        try:
-            await page.goto(url, wait_until="networkidle", timeout=timeout_ms)
-            html = await page.content()
-            return html
-        finally:
-            await context.close()
+        async with self._context_slots:
+            context = self._idle_contexts.pop() if self._idle_contexts else await self._browser.new_context()
+            try:
+                page = await context.new_page()
+            except Exception:
+                # Don't hand a broken context to the next render; a fresh one
+                # is created in its place on demand
+                with contextlib.suppress(Exception):
+                    await context.close()
+                raise
+            try:
+                await page.goto(url, wait_until="networkidle", timeout=timeout_ms)
+                html = await page.content()
+                return html
+            finally:
+                await page.close()
+                self._idle_contexts.append(context)
 
     async def close(self):
         with contextlib.suppress(Exception):
@@ -81,10 +120,16 @@ class AsyncCrawler:
         request_timeout_s: float = 20.0,
         user_agent: str = "Mozilla/5.0 (compatible; SiteScraper/1.0; +https://example.com/bot)",
         robots: bool = True,
+        robots_ttl_s: float = 6 * 3600.0,
         render: str = "auto",  # 'auto' | 'always' | 'never'
         download_images: bool = True,
         per_host_limit: int = 4,
         delay_ms: int = 0,
+        image_concurrency: int = 8,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry_s: float = 30.0,
+        parse_workers: Optional[int] = None,
+        render_contexts: Optional[int] = None,
     ) -> None:
         self.start_urls = list(start_urls)
         self.output_dir = output_dir
@@ -95,7 +140,17 @@ class AsyncCrawler:
         self.download_images = download_images
         self.delay_ms = delay_ms
 
-        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        # Keep idle connections around between page fetches so crawls across
+        # many hosts don't pay a new TLS handshake per request
+        if max_keepalive is None:
+            max_keepalive = max(100, max_concurrency * 4)
+        # httpx never keeps more idle connections than max_connections, so
+        # size the pool to fit the keep-alive limit
+        limits = httpx.Limits(
+            max_connections=max(max_concurrency * 4, max_keepalive),
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry_s,
+        )
         self.client = httpx.AsyncClient(
             headers={"User-Agent": user_agent},
             follow_redirects=True,
@@ -104,48 +159,138 @@ class AsyncCrawler:
             http2=True,
         )
         self.storage = StorageManager(output_dir)
-        self.playwright = PlaywrightManager() if render != "never" else None
-
+        # Default to one browser context per concurrent fetch so rendering
+        # doesn't cap throughput below --concurrency
+        if render_contexts is None:
+            render_contexts = max_concurrency
+        self.playwright = PlaywrightManager(max_contexts=render_contexts) if render != "never" else None
+
+        # visited is always a subset of enqueued, and both hold the same str
+        # objects as the queued CrawlTasks, so each URL is stored only once
         self.visited: Set[str] = set()
         self.queue: asyncio.Queue[CrawlTask] = asyncio.Queue()
         self.enqueued: Set[str] = set()
         self.pages_processed = 0
+        self.pages_failed = 0
 
         self._per_host_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._per_host_limit = per_host_limit
+        # Earliest monotonic time the next page request to a host may start,
+        # for hosts whose robots.txt sets a Crawl-delay
+        self._host_next_fetch: Dict[str, float] = {}
         self._global_semaphore = asyncio.Semaphore(max_concurrency)
+        # Shared across pages so image downloads can't crowd out HTML fetches
+        self._image_semaphore = asyncio.Semaphore(image_concurrency)
+        # One download per image URL for the whole crawl; pages that reference
+        # an image again reuse the saved path instead of re-fetching it
+        self.downloaded_images: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+        # Parsing is CPU-bound; run it in worker processes so the event loop
+        # keeps fetching. parse_workers=0 parses inline on the event loop.
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        self._parse_workers = parse_workers
+        self._parse_pool: Optional[concurrent.futures.ProcessPoolExecutor] = (
+            _new_parse_pool(parse_workers) if parse_workers > 0 else None
+        )
 
-        # Cache robot parser per base URL
-        self._robots_parsers: Dict[str, object] = {}
+        # Cache robot parser per base URL as (parser, expires_at, prefix_len);
+        # a None parser means "allow all" (robots.txt missing or unreachable)
+        # and a None prefix_len means its decisions can't be cached by prefix
+        self._robots_parsers: "OrderedDict[str, Tuple[Optional[Protego], float, Optional[int]]]" = OrderedDict()
+        # can_fetch results keyed on (base, expires_at, path prefix); only the
+        # first prefix_len chars of a path can change the decision, and
+        # expires_at keys out results from an older copy of robots.txt
+        self._robots_decisions: "OrderedDict[Tuple[str, float, str], bool]" = OrderedDict()
         self._robots_enabled = robots
+        self._robots_ttl_s = robots_ttl_s
 
-    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
-        host = urlparse(url).netloc
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
         if host not in self._per_host_semaphores:
             self._per_host_semaphores[host] = asyncio.Semaphore(self._per_host_limit)
         return self._per_host_semaphores[host]
 
+    async def _robots_entry(self, base: str) -> Tuple[Optional[Protego], float, Optional[int]]:
+        now = time.monotonic()
+        cached = self._robots_parsers.get(base)
+        if cached is not None and cached[1] > now:
+            self._robots_parsers.move_to_end(base)
+            return cached
+        rp = None
+        prefix_len = None
+        ttl = self._robots_ttl_s
+        robots_url = base + "/robots.txt"
+        try:
+            r = await self.client.get(robots_url)
+            if r.status_code == 200:
+                rp = Protego.parse(r.text)
+                prefix_len = robots_rule_prefix_len(r.text)
+            elif r.status_code >= 500:
+                ttl = ROBOTS_FAILURE_TTL_S
+        except Exception:
+            ttl = ROBOTS_FAILURE_TTL_S
+        entry = (rp, now + ttl, prefix_len)
+        self._robots_parsers[base] = entry
+        self._robots_parsers.move_to_end(base)
+        while len(self._robots_parsers) > ROBOTS_CACHE_SIZE:
+            self._robots_parsers.popitem(last=False)
+        return entry
+
+    async def _robots_parser(self, url: str) -> Optional[Protego]:
+        parsed = cached_urlparse(url)
+        entry = await self._robots_entry(f"{parsed.scheme}://{parsed.netloc}")
+        return entry[0]
+
     async def _robots_allows(self, url: str) -> bool:
         if not self._robots_enabled:
             return True
-        from urllib import robotparser
-
-        parsed = urlparse(url)
+        parsed = cached_urlparse(url)
         base = f"{parsed.scheme}://{parsed.netloc}"
-        rp = self._robots_parsers.get(base)
+        rp, expires_at, prefix_len = await self._robots_entry(base)
         if rp is None:
-            rp = robotparser.RobotFileParser()
-            robots_url = base + "/robots.txt"
-            try:
-                r = await self.client.get(robots_url)
-                if r.status_code == 200:
-                    rp.parse(r.text.splitlines())
-                else:
-                    rp.disallow_all = False  # type: ignore[attr-defined]
-            except Exception:
-                rp.disallow_all = False  # type: ignore[attr-defined]
-            self._robots_parsers[base] = rp
-        return rp.can_fetch(self.client.headers["User-Agent"], url)  # type: ignore[return-value]
+            return True
+        if prefix_len is None:
+            return rp.can_fetch(url, self.client.headers["User-Agent"])
+        key = (base, expires_at, url[len(base):][:prefix_len])
+        allowed = self._robots_decisions.get(key)
+        if allowed is None:
+            allowed = rp.can_fetch(url, self.client.headers["User-Agent"])
+            self._robots_decisions[key] = allowed
+            if len(self._robots_decisions) > ROBOTS_DECISION_CACHE_SIZE:
+                self._robots_decisions.popitem(last=False)
+        else:
+            self._robots_decisions.move_to_end(key)
+        return allowed
+
+    async def _crawl_delay_s(self, url: str) -> float:
+        if not self._robots_enabled:
+            return 0.0
+        rp = await self._robots_parser(url)
+        if rp is None:
+            return 0.0
+        crawl_delay = float(rp.crawl_delay(self.client.headers["User-Agent"]) or 0.0)
+        return min(crawl_delay, MAX_CRAWL_DELAY_S)
+
+    async def _acquire_global_slot(self, host: str, crawl_delay_s: float) -> None:
+        # Acquire the global semaphore once this host's Crawl-delay has passed.
+        # Waiting happens without holding a global slot, so a slow host can't
+        # starve the others; the next-allowed time is only claimed once the
+        # slot is held, so requests to the host start crawl_delay_s apart.
+        while True:
+            if crawl_delay_s:
+                wait_s = self._host_next_fetch.get(host, 0.0) - time.monotonic()
+                if wait_s > 0:
+                    await asyncio.sleep(wait_s)
+                    continue
+            await self._global_semaphore.acquire()
+            if crawl_delay_s:
+                now = time.monotonic()
+                if now < self._host_next_fetch.get(host, 0.0):
+                    # Another request to this host claimed the slot first
+                    self._global_semaphore.release()
+                    continue
+                self._host_next_fetch[host] = now + crawl_delay_s
+            return
 
     async def _fetch_http(self, url: str) -> Optional[Tuple[str, Optional[str]]]:
         try:
@@ -159,41 +304,73 @@ class AsyncCrawler:
 
     async def _download_image(self, url: str, content_disposition: Optional[str]) -> Optional[str]:
         try:
-            r = await self.client.get(url)
-            if r.status_code == 200 and r.content:
-                filename = guess_filename_for_url(url, r.headers.get("content-disposition") or content_disposition)
-                return await self.storage.save_binary(url, r.content, filename)
+            async with self.client.stream("GET", url) as r:
+                if r.status_code == 200:
+                    filename = guess_filename_for_url(url, r.headers.get("content-disposition") or content_disposition)
+                    return await self.storage.save_stream(url, r.aiter_bytes(IMAGE_CHUNK_SIZE), filename)
         except Exception:
             return None
         return None
 
-    async def _process_page(self, url: str, html: str, content_disposition: Optional[str]) -> None:
-        metadata = extract_metadata(html, url)
-        text_content = extract_text_content(html)
-        structured = extract_structured_data(html, url)
-        links = extract_links(html, url)
-        next_links = extract_pagination_next_links(html, url)
-        images = extract_image_sources(html, url) if self.download_images else []
+    def _replace_broken_parse_pool(self, broken: concurrent.futures.ProcessPoolExecutor) -> None:
+        # Several pages can see the same broken pool; only replace it once
+        if self._parse_pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = _new_parse_pool(self._parse_workers)
+
+    async def _extract_page(self, url: str, html: str) -> Dict[str, Any]:
+        if self._parse_pool is None:
+            return extract_page(html, url, self.download_images)
+        loop = asyncio.get_running_loop()
+        # A worker process that dies (OOM, crash in the native parser) breaks
+        # the whole pool, failing every page in flight. Replace the shared
+        # pool, then retry this page in a throwaway single-worker pool so a
+        # page that crashes the parser again only takes itself down.
+        pool = self._parse_pool
+        try:
+            return await loop.run_in_executor(pool, extract_page, html, url, self.download_images)
+        except BrokenProcessPool:
+            self._replace_broken_parse_pool(pool)
+        retry_pool = _new_parse_pool(1)
+        try:
+            return await loop.run_in_executor(retry_pool, extract_page, html, url, self.download_images)
+        finally:
+            # Don't block the event loop joining the worker process
+            retry_pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _process_page(
+        self, url: str, html: str, content_disposition: Optional[str], page: Optional[Dict[str, Any]] = None
+    ) -> None:
+        if page is None:
+            page = await self._extract_page(url, html)
+        links: List[str] = page["links"]
+        next_links: List[str] = page["pagination_next_links"]
+        images: List[str] = page["images"]
 
         html_path = await self.storage.save_html(url, html)
 
         image_saves: List[Tuple[str, Optional[str]]] = []
         if self.download_images and images:
-            sem = asyncio.Semaphore(8)
+            async def download_one(img_url: str) -> Optional[str]:
+                async with self._image_semaphore:
+                    return await self._download_image(img_url, content_disposition)
 
             async def save_one(img_url: str) -> None:
-                async with sem:
-                    saved = await self._download_image(img_url, content_disposition)
-                    image_saves.append((img_url, saved))
+                download = self.downloaded_images.get(img_url)
+                if download is None:
+                    download = asyncio.ensure_future(download_one(img_url))
+                    self.downloaded_images[img_url] = download
+                saved = await asyncio.shield(download)
+                image_saves.append((img_url, saved))
 
             await asyncio.gather(*(save_one(i) for i in images))
 
         record = {
             "url": url,
             "html_path": html_path,
-            "metadata": metadata,
-            "structured_data": structured,
-            "text": text_content,
+            "metadata": page["metadata"],
+            "structured_data": page["structured_data"],
+            "text": page["text"],
             "links": links,
             "pagination_next_links": next_links,
             "images": [{"src": src, "saved_path": path} for src, path in image_saves],
@@ -202,13 +379,16 @@ class AsyncCrawler:
 
         # Enqueue discovered links with incremented depth
         next_depth = 1
-        for href in links + next_links:
-            norm = normalize_url(url, href)
-            if not norm:
+        seen_hrefs: Set[str] = set()
+        for href in itertools.chain(links, next_links):
+            # Nav bars repeat the same hrefs; normalize each one only once
+            if href in seen_hrefs:
                 continue
-            if norm in self.enqueued or norm in self.visited:
+            seen_hrefs.add(href)
+            norm = normalize_allowed_url(url, href, self.allowed_domains)
+            if not norm:
                 continue
-            if not is_allowed_domain(norm, self.allowed_domains):
+            if norm in self.enqueued:
                 continue
             await self.queue.put(CrawlTask(norm, next_depth))
             self.enqueued.add(norm)
@@ -220,17 +400,24 @@ class AsyncCrawler:
             return
         if task.depth > self.max_depth:
             return
-        if not is_allowed_domain(task.url, self.allowed_domains):
+        parsed = cached_urlparse(task.url)
+        if not is_allowed_netloc(parsed.netloc, self.allowed_domains):
             return
         if not await self._robots_allows(task.url):
             return
 
         self.visited.add(task.url)
 
-        # Optional per-host and global throttling
-        await self._global_semaphore.acquire()
-        host_sem = self._host_semaphore(task.url)
+        # Optional per-host and global throttling; robots.txt Crawl-delay is
+        # honored across all page requests to this host
+        crawl_delay_s = await self._crawl_delay_s(task.url)
+        host_sem = self._host_semaphore(parsed.netloc)
         await host_sem.acquire()
+        try:
+            await self._acquire_global_slot(parsed.netloc, crawl_delay_s)
+        except BaseException:
+            host_sem.release()
+            raise
         try:
             if self.delay_ms:
                 await asyncio.sleep(self.delay_ms / 1000.0)
@@ -238,57 +425,78 @@ class AsyncCrawler:
             http_result = await self._fetch_http(task.url)
             html, content_disposition = (http_result or (None, None))
             needs_render = False
+            page = None
 
             if self.render_mode == "always":
                 needs_render = True
             elif self.render_mode == "auto":
-                if not html or should_render_heuristic(html):
+                if not html:
                     needs_render = True
+                else:
+                    # Extract once here; the result is reused by _process_page
+                    page = await self._extract_page(task.url, html)
+                    needs_render = page["needs_render"]
 
             if needs_render and self.playwright is not None:
                 try:
                     rendered = await self.playwright.render_content(task.url)
                     if rendered:
                         html = rendered
+                        page = None
                 except Exception:
                     pass
 
             if not html:
                 return
 
-            await self._process_page(task.url, html, content_disposition)
+            await self._process_page(task.url, html, content_disposition, page)
             self.pages_processed += 1
         finally:
             host_sem.release()
             self._global_semaphore.release()
 
     async def run(self) -> None:
-        for url in self.start_urls:
-            self.enqueued.add(url)
-            await self.queue.put(CrawlTask(url, 0))
-
-        workers = []
-        num_workers = max(2, min(32, self._global_semaphore._value))  # type: ignore[attr-defined]
-        async def worker() -> None:
-            while self.pages_processed < self.max_pages:
-                try:
-                    task = await asyncio.wait_for(self.queue.get(), timeout=1.5)
-                except asyncio.TimeoutError:
-                    if self.pages_processed >= self.max_pages:
-                        break
-                    # no task
-                    continue
+        await self.storage.start()
+        workers: List[asyncio.Task] = []
+        try:
+            for url in self.start_urls:
+                self.enqueued.add(url)
+                await self.queue.put(CrawlTask(url, 0))
+
+            num_workers = max(2, min(32, self._global_semaphore._value))  # type: ignore[attr-defined]
+            async def worker() -> None:
+                while self.pages_processed < self.max_pages:
+                    try:
+                        task = await asyncio.wait_for(self.queue.get(), timeout=1.5)
+                    except asyncio.TimeoutError:
+                        if self.pages_processed >= self.max_pages:
+                            break
+                        # no task
+                        continue
+                    try:
+                        await self._handle_task(task)
+                    except Exception:
+                        # A single bad page must not take the worker down
+                        self.pages_failed += 1
+                        logger.exception("Failed to crawl %s", task.url)
+                    finally:
+                        self.queue.task_done()
+
+            workers = [asyncio.create_task(worker()) for _ in range(num_workers)]
+            await self.queue.join()
+        finally:
+            # Always release resources and flush buffered records, including
+            # on Ctrl-C or when run() itself is cancelled
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            try:
+                await self.client.aclose()
+            finally:
                 try:
-                    await self._handle_task(task)
+                    await self.storage.aclose()
                 finally:
-                    self.queue.task_done()
-
-        workers = [asyncio.create_task(worker()) for _ in range(num_workers)]
-        await self.queue.join()
-        for w in workers:
-            w.cancel()
-        with contextlib.suppress(Exception):
-            await asyncio.gather(*workers)
-        await self.client.aclose()
-        if self.playwright:
-            await self.playwright.close()
\ No newline at end of file
+                    if self._parse_pool is not None:
+                        self._parse_pool.shutdown()
+                    if self.playwright:
+                        await self.playwright.close()
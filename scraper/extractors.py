@@ -1,100 +1,119 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 from w3lib.html import get_base_url
 
-from .utils import collapse_whitespace
+from .utils import collapse_text_lines, count_visible_chars, has_next_text_hint, load_json, looks_client_rendered
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # pragma: no cover - optional dependency
+    LexborHTMLParser = None  # type: ignore[assignment,misc]
 
-def extract_links(html: str, page_url: str) -> List[str]:
-    soup = BeautifulSoup(html, "lxml")
-    base_url = get_base_url(html, page_url)
+
+def parse_html(html: str) -> Any:
+    # Build the tree once per page and hand it to the *_from_tree extractors
+    return LexborHTMLParser(html)
+
+
+def should_render_heuristic_from_tree(tree: Any, html: str) -> bool:
+    # Same heuristic as utils.should_render_heuristic, reusing the parsed tree
+    body = tree.body
+    text_len = count_visible_chars(body.text()) if body is not None else 0
+    return looks_client_rendered(text_len, len(tree.css("script")), html or "")
+
+
+def _rel_tokens(node: Any) -> List[str]:
+    return (node.attributes.get("rel") or "").lower().split()
+
+
+def extract_links_from_tree(tree: Any, base_url: str) -> List[str]:
     links: List[str] = []
-    for a in soup.find_all("a", href=True):
-        href = a.get("href")
+    for a in tree.css("a[href]"):
+        href = a.attributes.get("href")
         if href:
             links.append(urljoin(base_url, href))
     return links
 
 
-def extract_pagination_next_links(html: str, page_url: str) -> List[str]:
-    soup = BeautifulSoup(html, "lxml")
-    base_url = get_base_url(html, page_url)
+def extract_pagination_next_links_from_tree(tree: Any, base_url: str) -> List[str]:
     candidates: List[str] = []
+    seen: Set[str] = set()
     # <link rel="next" href="...">
-    for link in soup.find_all("link", rel=lambda x: x and "next" in x):
-        href = link.get("href")
-        if href:
-            candidates.append(urljoin(base_url, href))
+    for link in tree.css("link[rel]"):
+        href = link.attributes.get("href")
+        if href and "next" in _rel_tokens(link):
+            url = urljoin(base_url, href)
+            if url not in seen:
+                seen.add(url)
+                candidates.append(url)
     # anchors with rel/aria-label/text hints
-    for a in soup.find_all("a", href=True):
-        text = collapse_whitespace(a.get_text(" "))[:100].lower()
-        rel = (a.get("rel") or [])
-        aria = (a.get("aria-label") or "").lower()
-        if ("next" in rel) or ("next" in aria) or ("next" in text) or ("older" in text) or ("more" in text):
-            candidates.append(urljoin(base_url, a["href"]))
-    return list(dict.fromkeys(candidates))
+    # (anchor text is only extracted when rel/aria-label don't already match)
+    for a in tree.css("a[href]"):
+        aria = (a.attributes.get("aria-label") or "").lower()
+        if ("next" in _rel_tokens(a)) or ("next" in aria) or has_next_text_hint(a.text(separator=" ")):
+            url = urljoin(base_url, a.attributes.get("href") or "")
+            if url not in seen:
+                seen.add(url)
+                candidates.append(url)
+    return candidates
+
+
+def extract_text_content_from_tree(tree: Any) -> str:
+    # Note: strips script/style tags in place, so run this after the
+    # other extractors when sharing one tree.
+    tree.strip_tags(["script", "style", "noscript"])
+    root = tree.root
+    text = root.text(separator="\n") if root is not None else ""
+    # Collapse excessive blank lines
+    return collapse_text_lines(text)
 
 
-def extract_text_content(html: str) -> str:
-    soup = BeautifulSoup(html, "lxml")
-    # Remove script/style
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
-    text = soup.get_text("\n")
-    # Collapse excessive blank lines
-    lines = [collapse_whitespace(line) for line in text.splitlines()]
-    lines = [line for line in lines if line]
-    return "\n".join(lines)
+def _meta_content(tree: Any, selector: str) -> Optional[str]:
+    node = tree.css_first(selector)
+    if node is None:
+        return None
+    content = node.attributes.get("content")
+    return content.strip() if content else None
 
 
-def extract_metadata(html: str, page_url: str) -> Dict[str, Optional[str]]:
-    soup = BeautifulSoup(html, "lxml")
+def extract_metadata_from_tree(tree: Any) -> Dict[str, Optional[str]]:
     meta: Dict[str, Optional[str]] = {}
 
     # Title
-    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    title_node = tree.css_first("title")
+    title = title_node.text().strip() if title_node is not None and title_node.text() else None
     meta["title"] = title
 
-    # Meta description/keywords
-    desc = soup.find("meta", attrs={"name": "description"})
-    if desc and desc.get("content"):
-        meta["meta_description"] = desc.get("content").strip()
-    keyw = soup.find("meta", attrs={"name": "keywords"})
-    if keyw and keyw.get("content"):
-        meta["meta_keywords"] = keyw.get("content").strip()
-
-    # OpenGraph basic fields
-    og_title = soup.find("meta", property="og:title")
-    if og_title and og_title.get("content"):
-        meta["og_title"] = og_title.get("content").strip()
-    og_desc = soup.find("meta", property="og:description")
-    if og_desc and og_desc.get("content"):
-        meta["og_description"] = og_desc.get("content").strip()
-    og_type = soup.find("meta", property="og:type")
-    if og_type and og_type.get("content"):
-        meta["og_type"] = og_type.get("content").strip()
-    og_url = soup.find("meta", property="og:url")
-    if og_url and og_url.get("content"):
-        meta["og_url"] = og_url.get("content").strip()
+    # Meta description/keywords, OpenGraph basic fields
+    for key, selector in [
+        ("meta_description", 'meta[name="description"]'),
+        ("meta_keywords", 'meta[name="keywords"]'),
+        ("og_title", 'meta[property="og:title"]'),
+        ("og_description", 'meta[property="og:description"]'),
+        ("og_type", 'meta[property="og:type"]'),
+        ("og_url", 'meta[property="og:url"]'),
+    ]:
+        value = _meta_content(tree, selector)
+        if value:
+            meta[key] = value
 
     # Canonical
-    canonical = soup.find("link", rel=lambda x: x and "canonical" in x)
-    if canonical and canonical.get("href"):
-        meta["canonical"] = canonical.get("href").strip()
+    canonical = tree.css_first('link[rel~="canonical" i]')
+    if canonical is not None and canonical.attributes.get("href"):
+        meta["canonical"] = canonical.attributes["href"].strip()
 
     return meta
 
 
-def extract_structured_data(html: str, page_url: str) -> Dict[str, List[dict]]:
+def extract_structured_data_from_tree(tree: Any) -> Dict[str, List[dict]]:
     # Minimal structured data: extract JSON-LD only to avoid heavy deps
-    soup = BeautifulSoup(html, "lxml")
     jsonld_list: List[dict] = []
-    for script in soup.find_all("script", type=lambda t: t and "ld+json" in t):
+    for script in tree.css("script[type]"):
+        if "ld+json" not in (script.attributes.get("type") or ""):
+            continue
         try:
-            import json
-            data = json.loads(script.string or script.get_text() or "")
+            data = load_json(script.text() or "")
             if isinstance(data, list):
                 jsonld_list.extend([d for d in data if isinstance(d, dict)])
             elif isinstance(data, dict):
@@ -104,15 +123,74 @@ def extract_structured_data(html: str, page_url: str) -> Dict[str, List[dict]]:
     return {"json-ld": jsonld_list}
 
 
-def extract_image_sources(html: str, page_url: str) -> List[str]:
-    soup = BeautifulSoup(html, "lxml")
-    base_url = get_base_url(html, page_url)
+def extract_image_sources_from_tree(tree: Any, base_url: str) -> List[str]:
     srcs: List[str] = []
-    for img in soup.find_all("img"):
+    # De-duplicate while preserving order
+    seen: Set[str] = set()
+    for img in tree.css("img"):
+        attrs = img.attributes
         for attr in ["src", "data-src", "data-original", "data-lazy-src"]:
-            val = img.get(attr)
+            val = attrs.get(attr)
             if val:
-                srcs.append(urljoin(base_url, val))
+                url = urljoin(base_url, val)
+                if url not in seen:
+                    seen.add(url)
+                    srcs.append(url)
                 break
-    # De-duplicate while preserving order
-    return list(dict.fromkeys(srcs))
\ No newline at end of file
+    return srcs
+
+
+if LexborHTMLParser is None:  # pragma: no cover - exercised only without selectolax
+    # selectolax is unavailable; fall back to the slower BeautifulSoup tree
+    from .extractors_bs4 import (  # noqa: F811
+        extract_image_sources_from_soup as extract_image_sources_from_tree,
+        extract_links_from_soup as extract_links_from_tree,
+        extract_metadata_from_soup as extract_metadata_from_tree,
+        extract_pagination_next_links_from_soup as extract_pagination_next_links_from_tree,
+        extract_structured_data_from_soup as extract_structured_data_from_tree,
+        extract_text_content_from_soup as extract_text_content_from_tree,
+        parse_html,
+        should_render_heuristic_from_soup as should_render_heuristic_from_tree,
+    )
+
+
+def extract_links(html: str, page_url: str) -> List[str]:
+    return extract_links_from_tree(parse_html(html), get_base_url(html, page_url))
+
+
+def extract_pagination_next_links(html: str, page_url: str) -> List[str]:
+    return extract_pagination_next_links_from_tree(parse_html(html), get_base_url(html, page_url))
+
+
+def extract_text_content(html: str) -> str:
+    return extract_text_content_from_tree(parse_html(html))
+
+
+def extract_metadata(html: str, page_url: str) -> Dict[str, Optional[str]]:
+    return extract_metadata_from_tree(parse_html(html))
+
+
+def extract_structured_data(html: str, page_url: str) -> Dict[str, List[dict]]:
+    return extract_structured_data_from_tree(parse_html(html))
+
+
+def extract_image_sources(html: str, page_url: str) -> List[str]:
+    return extract_image_sources_from_tree(parse_html(html), get_base_url(html, page_url))
+
+
+def extract_page(html: str, page_url: str, include_images: bool = True) -> Dict[str, Any]:
+    # Parse once and run every extractor. Returns only plain data, so the
+    # crawler can run this in a worker process.
+    tree = parse_html(html)
+    base_url = get_base_url(html, page_url)
+    page: Dict[str, Any] = {
+        "needs_render": should_render_heuristic_from_tree(tree, html),
+        "metadata": extract_metadata_from_tree(tree),
+        "structured_data": extract_structured_data_from_tree(tree),
+        "links": extract_links_from_tree(tree, base_url),
+        "pagination_next_links": extract_pagination_next_links_from_tree(tree, base_url),
+        "images": extract_image_sources_from_tree(tree, base_url) if include_images else [],
+    }
+    # Text extraction strips script/style tags in place, so it must run last
+    page["text"] = extract_text_content_from_tree(tree)
+    return page
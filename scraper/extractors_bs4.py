@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from .utils import collapse_text_lines, count_visible_chars, has_next_text_hint, load_json, looks_client_rendered
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    # Fallback used when selectolax is not installed
+    return BeautifulSoup(html, "lxml")
+
+
+def should_render_heuristic_from_soup(soup: BeautifulSoup, html: str) -> bool:
+    text_len = count_visible_chars(soup.body.get_text()) if soup.body else 0
+    return looks_client_rendered(text_len, len(soup.find_all("script")), html or "")
+
+
+def extract_links_from_soup(soup: BeautifulSoup, base_url: str) -> List[str]:
+    links: List[str] = []
+    for a in soup.find_all("a", href=True):
+        href = a.get("href")
+        if href:
+            links.append(urljoin(base_url, href))
+    return links
+
+
+def extract_pagination_next_links_from_soup(soup: BeautifulSoup, base_url: str) -> List[str]:
+    candidates: List[str] = []
+    seen: Set[str] = set()
+    # <link rel="next" href="...">
+    for link in soup.find_all("link", rel=lambda x: x and "next" in x):
+        href = link.get("href")
+        if href:
+            url = urljoin(base_url, href)
+            if url not in seen:
+                seen.add(url)
+                candidates.append(url)
+    # anchors with rel/aria-label/text hints
+    for a in soup.find_all("a", href=True):
+        rel = (a.get("rel") or [])
+        aria = (a.get("aria-label") or "").lower()
+        if ("next" in rel) or ("next" in aria) or has_next_text_hint(a.get_text(" ")):
+            url = urljoin(base_url, a["href"])
+            if url not in seen:
+                seen.add(url)
+                candidates.append(url)
+    return candidates
+
+
+def extract_text_content_from_soup(soup: BeautifulSoup) -> str:
+    # Note: decomposes script/style tags in place, so run this after the
+    # other extractors (or on a copy) when sharing one soup.
+    # Remove script/style
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    text = soup.get_text("\n")
+    # Collapse excessive blank lines
+    return collapse_text_lines(text)
+
+
+def extract_metadata_from_soup(soup: BeautifulSoup) -> Dict[str, Optional[str]]:
+    meta: Dict[str, Optional[str]] = {}
+
+    # Title
+    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    meta["title"] = title
+
+    # Meta description/keywords
+    desc = soup.find("meta", attrs={"name": "description"})
+    if desc and desc.get("content"):
+        meta["meta_description"] = desc.get("content").strip()
+    keyw = soup.find("meta", attrs={"name": "keywords"})
+    if keyw and keyw.get("content"):
+        meta["meta_keywords"] = keyw.get("content").strip()
+
+    # OpenGraph basic fields
+    og_title = soup.find("meta", property="og:title")
+    if og_title and og_title.get("content"):
+        meta["og_title"] = og_title.get("content").strip()
+    og_desc = soup.find("meta", property="og:description")
+    if og_desc and og_desc.get("content"):
+        meta["og_description"] = og_desc.get("content").strip()
+    og_type = soup.find("meta", property="og:type")
+    if og_type and og_type.get("content"):
+        meta["og_type"] = og_type.get("content").strip()
+    og_url = soup.find("meta", property="og:url")
+    if og_url and og_url.get("content"):
+        meta["og_url"] = og_url.get("content").strip()
+
+    # Canonical
+    canonical = soup.find("link", rel=lambda x: x and "canonical" in x)
+    if canonical and canonical.get("href"):
+        meta["canonical"] = canonical.get("href").strip()
+
+    return meta
+
+
+def extract_structured_data_from_soup(soup: BeautifulSoup) -> Dict[str, List[dict]]:
+    # Minimal structured data: extract JSON-LD only to avoid heavy deps
+    jsonld_list: List[dict] = []
+    for script in soup.find_all("script", type=lambda t: t and "ld+json" in t):
+        try:
+            data = load_json(str(script.string or script.get_text() or ""))
+            if isinstance(data, list):
+                jsonld_list.extend([d for d in data if isinstance(d, dict)])
+            elif isinstance(data, dict):
+                jsonld_list.append(data)
+        except Exception:
+            continue
+    return {"json-ld": jsonld_list}
+
+
+def extract_image_sources_from_soup(soup: BeautifulSoup, base_url: str) -> List[str]:
+    srcs: List[str] = []
+    # De-duplicate while preserving order
+    seen: Set[str] = set()
+    for img in soup.find_all("img"):
+        for attr in ["src", "data-src", "data-original", "data-lazy-src"]:
+            val = img.get(attr)
+            if val:
+                url = urljoin(base_url, val)
+                if url not in seen:
+                    seen.add(url)
+                    srcs.append(url)
+                break
+    return srcs
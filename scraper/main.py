@@ -15,11 +15,17 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--max-depth", type=int, default=5, help="Maximum crawl depth")
     p.add_argument("--concurrency", type=int, default=8, help="Maximum global concurrency")
     p.add_argument("--per-host", type=int, default=4, help="Maximum connections per host")
+    p.add_argument("--max-keepalive", type=int, default=None, help="Maximum idle keep-alive connections (default: max(100, 4 x concurrency))")
+    p.add_argument("--keepalive-expiry", type=float, default=30.0, help="Seconds an idle keep-alive connection is kept open")
     p.add_argument("--timeout", type=float, default=20.0, help="Request timeout in seconds")
     p.add_argument("--user-agent", default="Mozilla/5.0 (compatible; SiteScraper/1.0; +https://example.com/bot)")
     p.add_argument("--no-robots", action="store_true", help="Ignore robots.txt")
+    p.add_argument("--robots-ttl", type=float, default=6 * 3600.0, help="Seconds to cache each host's robots.txt")
     p.add_argument("--render", choices=["auto", "always", "never"], default="auto", help="Use Playwright rendering policy")
+    p.add_argument("--render-contexts", type=int, default=None, help="Maximum concurrent Playwright browser contexts (default: --concurrency)")
     p.add_argument("--no-images", action="store_true", help="Do not download images")
+    p.add_argument("--image-concurrency", type=int, default=8, help="Maximum concurrent image downloads across all pages")
+    p.add_argument("--parse-workers", type=int, default=None, help="Worker processes for HTML parsing (default: CPU count, 0 parses in-process)")
     p.add_argument("--delay-ms", type=int, default=0, help="Optional delay between requests in milliseconds")
     return p.parse_args()
 
@@ -35,18 +41,30 @@ async def main_async(args: argparse.Namespace) -> None:
         max_concurrency=args.concurrency,
         per_host_limit=args.per_host,
         request_timeout_s=args.timeout,
+        max_keepalive=args.max_keepalive,
+        keepalive_expiry_s=args.keepalive_expiry,
         user_agent=args.user_agent,
         robots=not args.no_robots,
+        robots_ttl_s=args.robots_ttl,
         render=args.render,
+        render_contexts=args.render_contexts,
         download_images=not args.no_images,
         delay_ms=args.delay_ms,
+        image_concurrency=args.image_concurrency,
+        parse_workers=args.parse_workers,
     )
     await crawler.run()
 
 
 def main() -> None:
     args = parse_args()
-    asyncio.run(main_async(args))
+    # uvloop is optional; use its faster event loop when it is installed
+    try:
+        import uvloop  # type: ignore
+    except ImportError:
+        asyncio.run(main_async(args))
+    else:
+        uvloop.run(main_async(args))
 
 
 if __name__ == "__main__":
@@ -1,15 +1,37 @@
 import asyncio
+import contextlib
 import json
+import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterable, Dict, List, Optional
 
 import aiofiles
+import orjson
 
-from .utils import compute_sha1, sanitize_filename
+from .utils import compute_hash, new_content_hasher, sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+
+def _write_file(path: str, data: bytes) -> None:
+    # One open + write per file, run in the default executor by callers
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
 
 
 class StorageManager:
+    # Records are buffered and written in batches of this size, or at least
+    # every JSONL_FLUSH_INTERVAL_S seconds while the manager is started
+    JSONL_BATCH_SIZE = 64
+    JSONL_FLUSH_INTERVAL_S = 1.0
+
     def __init__(self, base_dir: str):
         self.base_dir = Path(base_dir)
         self.pages_dir = self.base_dir / "pages"
@@ -17,34 +39,133 @@ class StorageManager:
         self.images_dir = self.assets_dir / "images"
         self.jsonl_path = self.base_dir / "data.jsonl"
         self._jsonl_lock = asyncio.Lock()
+        self._jsonl_buffer: List[bytes] = []
+        self._jsonl_fh = None
+        self._flush_task: Optional[asyncio.Task] = None
         self._ensure_dirs()
 
     def _ensure_dirs(self) -> None:
         self.pages_dir.mkdir(parents=True, exist_ok=True)
         self.images_dir.mkdir(parents=True, exist_ok=True)
 
+    async def start(self) -> None:
+        self._jsonl_fh = await aiofiles.open(self.jsonl_path, mode="ab")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def aclose(self) -> None:
+        # Always attempt the final flush and close the file; an error from the
+        # flush task is only re-raised afterwards
+        task_error: Optional[BaseException] = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                task_error = e
+            self._flush_task = None
+        async with self._jsonl_lock:
+            try:
+                await self._flush_locked()
+            finally:
+                if self._jsonl_fh is not None:
+                    await self._jsonl_fh.close()
+                    self._jsonl_fh = None
+        if task_error is not None:
+            raise task_error
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.JSONL_FLUSH_INTERVAL_S)
+            try:
+                async with self._jsonl_lock:
+                    await self._flush_locked()
+            except Exception:
+                # Keep the records buffered and retry on the next tick
+                logger.exception(
+                    "Failed to write %d buffered records to %s", len(self._jsonl_buffer), self.jsonl_path
+                )
+
+    async def _flush_locked(self) -> None:
+        if not self._jsonl_buffer:
+            return
+        batch = b"".join(self._jsonl_buffer)
+        if self._jsonl_fh is not None:
+            await self._jsonl_fh.write(batch)
+            await self._jsonl_fh.flush()
+        else:
+            async with aiofiles.open(self.jsonl_path, mode="ab") as f:
+                await f.write(batch)
+        # Only drop records once they are written, so a failed write is retried
+        self._jsonl_buffer.clear()
+
     async def append_jsonl(self, record: Dict[str, Any]) -> None:
-        text = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            line = orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            # e.g. JSON-LD integers past 64 bits, which orjson can't encode
+            line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
         async with self._jsonl_lock:
-            async with aiofiles.open(self.jsonl_path, mode="a", encoding="utf-8") as f:
-                await f.write(text)
+            self._jsonl_buffer.append(line)
+            # Without start() there is no flush loop, so write through
+            if self._jsonl_fh is None or len(self._jsonl_buffer) >= self.JSONL_BATCH_SIZE:
+                await self._flush_locked()
 
     async def save_html(self, url: str, html: str) -> str:
         # Use a hash to avoid path length issues and ensure uniqueness
-        sha = compute_sha1(url.encode("utf-8"))
-        filename = f"{sha}.html"
+        digest = compute_hash(url.encode("utf-8"))
+        filename = f"{digest}.html"
         full_path = self.pages_dir / filename
-        async with aiofiles.open(full_path, mode="w", encoding="utf-8") as f:
-            await f.write(html)
+        data = html.encode("utf-8")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_file, str(full_path), data)
         return str(full_path)
 
     async def save_binary(self, url: str, content: bytes, suggested_filename: Optional[str] = None) -> str:
         if suggested_filename:
             filename = sanitize_filename(suggested_filename)
         else:
-            sha = compute_sha1(content)
-            filename = f"{sha}"
+            digest = compute_hash(content)
+            filename = f"{digest}"
         full_path = self.images_dir / filename
         async with aiofiles.open(full_path, mode="wb") as f:
             await f.write(content)
-        return str(full_path)
\ No newline at end of file
+        return str(full_path)
+
+    async def save_stream(
+        self, url: str, chunks: AsyncIterable[bytes], suggested_filename: Optional[str] = None
+    ) -> Optional[str]:
+        # Write chunks as they arrive so only one chunk per download is held
+        # in memory. Without a filename the content hash is only known at the
+        # end, so write to a temporary name and rename. Returns None if empty.
+        tmp_path = self.images_dir / f"{compute_hash(url.encode('utf-8'))}.part"
+        if suggested_filename:
+            full_path = self.images_dir / sanitize_filename(suggested_filename)
+            hasher = None
+        else:
+            full_path = None
+            hasher = new_content_hasher()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, mode="wb") as f:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    size += len(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        if not size:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return None
+        if full_path is None:
+            assert hasher is not None
+            full_path = self.images_dir / hasher.hexdigest()
+        os.replace(tmp_path, full_path)
+        return str(full_path)
@@ -1,8 +1,12 @@
-import hashlib
+import functools
+import json
 import os
 import re
-from typing import Iterable, Optional
-from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+from typing import Any, Iterable, Optional, Tuple
+from urllib.parse import ParseResult, urljoin, urlparse, urlunparse, parse_qsl, urlencode
+
+import orjson
+import xxhash
 
 
 TRACKING_PARAMS = {
@@ -16,42 +20,86 @@ TRACKING_PARAMS = {
     "mc_eid",
 }
 
+_WS_RE = re.compile(r"\s+")
+_INLINE_WS_RE = re.compile(r"[^\S\n]+")
+_BLANK_LINES_RE = re.compile(r" ?\n[ \n]*")
+_TAG_RE = re.compile(r"<[^>]+>")
+_SCRIPT_RE = re.compile(r"<script[\s>]", re.I)
+_SCHEME_RE = re.compile(r"^(javascript:|mailto:|tel:)", re.I)
+_SAN_RE = re.compile(r"[^A-Za-z0-9._-]+")
+_CD_RE = re.compile(r'filename\*?="?([^";]+)"?')
+# 20+ digit runs may be integers past 64 bits, which orjson turns into floats
+_BIG_INT_RE = re.compile(r"\d{20}")
+# Plain substring checks beat a combined regex or an Aho-Corasick
+# automaton for this handful of short literals
+SPA_MARKERS = ('id="__next"', "data-reactroot", "ng-version", 'id="app"', 'id="root"')
+
+
+@functools.lru_cache(maxsize=4096)
+def cached_urlparse(url: str) -> ParseResult:
+    # The same URL is parsed several times per task (domain, host, robots)
+    return urlparse(url)
+
 
-def compute_sha1(data: bytes) -> str:
-    sha1 = hashlib.sha1()
-    sha1.update(data)
-    return sha1.hexdigest()
+def compute_hash(data: bytes) -> str:
+    # Content-address filenames only need to be unique, not cryptographic
+    return xxhash.xxh3_128_hexdigest(data)
+
+
+def new_content_hasher() -> "xxhash.xxh3_128":
+    # Incremental counterpart of compute_hash for streamed content
+    return xxhash.xxh3_128()
 
 
 def sanitize_filename(name: str, max_length: int = 140) -> str:
-    name = re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+    name = _SAN_RE.sub("_", name)
     return name[:max_length] or "file"
 
 
 def strip_fragment_and_tracking(url: str) -> str:
-    parsed = urlparse(url)
-    # Drop fragment
-    parsed = parsed._replace(fragment="")
-    # Remove common tracking params
-    query_pairs = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k.lower() not in TRACKING_PARAMS]
-    parsed = parsed._replace(query=urlencode(query_pairs))
-    return urlunparse(parsed)
+    return _strip_parsed(urlparse(url))
+
+
+def _strip_parsed(parsed: ParseResult) -> str:
+    # Drop fragment and remove common tracking params in a single rebuild
+    query = parsed.query
+    if query:
+        query_pairs = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k.lower() not in TRACKING_PARAMS]
+        query = urlencode(query_pairs)
+    return urlunparse(parsed._replace(query=query, fragment=""))
 
 
 def normalize_url(base_url: str, href: str) -> Optional[str]:
     if not href:
         return None
     # Ignore javascript:, mailto:, tel:
-    if re.match(r"^(javascript:|mailto:|tel:)", href, re.I):
+    if _SCHEME_RE.match(href):
         return None
     absolute = urljoin(base_url, href)
     return strip_fragment_and_tracking(absolute)
 
 
+def normalize_allowed_url(base_url: str, href: str, allowed_domains: Iterable[str]) -> Optional[str]:
+    # normalize_url + is_allowed_domain on a single parse; off-domain links
+    # are rejected before the query string is rebuilt
+    if not href or _SCHEME_RE.match(href):
+        return None
+    parsed = urlparse(urljoin(base_url, href))
+    if not is_allowed_netloc(parsed.netloc, allowed_domains):
+        return None
+    return _strip_parsed(parsed)
+
+
 def is_allowed_domain(url: str, allowed_domains: Iterable[str]) -> bool:
     if not allowed_domains:
         return True
-    netloc = urlparse(url).netloc.lower()
+    return is_allowed_netloc(cached_urlparse(url).netloc, allowed_domains)
+
+
+def is_allowed_netloc(netloc: str, allowed_domains: Iterable[str]) -> bool:
+    if not allowed_domains:
+        return True
+    netloc = netloc.lower()
     for domain in allowed_domains:
         d = domain.lower().lstrip(".")
         if netloc == d or netloc.endswith("." + d):
@@ -62,30 +110,117 @@ def is_allowed_domain(url: str, allowed_domains: Iterable[str]) -> bool:
 def guess_filename_for_url(url: str, content_disposition: Optional[str] = None) -> str:
     filename = None
     if content_disposition:
-        match = re.search(r'filename\*?="?([^";]+)"?', content_disposition)
+        match = _CD_RE.search(content_disposition)
         if match:
             filename = match.group(1)
     if not filename:
-        path = urlparse(url).path
+        path = cached_urlparse(url).path
         filename = os.path.basename(path) or "index.html"
     return sanitize_filename(filename)
 
 
 def collapse_whitespace(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
+
+
+def collapse_text_lines(text: str) -> str:
+    # Equivalent to collapsing whitespace per line and dropping blank lines,
+    # without materializing the list of lines
+    return _BLANK_LINES_RE.sub("\n", _INLINE_WS_RE.sub(" ", text)).strip()
+
+
+def count_visible_chars(text: str) -> int:
+    return len(_WS_RE.sub("", text))
+
+
+def looks_client_rendered(text_len: int, script_count: int, html: str) -> bool:
+    # Heuristics: very low text, many scripts, common SPA markers
+    if text_len < 400 and script_count >= 5:
+        return True
+    for marker in SPA_MARKERS:
+        if marker in html:
+            return True
+    return False
+
+
+def has_next_text_hint(text: str) -> bool:
+    # Anchor text that suggests a pagination link
+    text = collapse_whitespace(text)[:100].lower()
+    return ("next" in text) or ("older" in text) or ("more" in text)
 
 
 def should_render_heuristic(html: str) -> bool:
     # Render if page looks empty or heavily JS-driven
-    # Heuristics: very low text, many scripts, common SPA markers
-    text_len = len(re.sub(r"\s+", "", re.sub(r"<[^>]+>", "", html or "")))
-    script_count = len(re.findall(r"<script[\s>]", html or "", re.I))
-    spa_markers = [
-        "id=\"__next\"",
-        "data-reactroot",
-        "ng-version",
-        "id=\"app\"",
-        "id=\"root\"",
-    ]
-    has_spa_marker = any(m in (html or "") for m in spa_markers)
-    return (text_len < 400 and script_count >= 5) or has_spa_marker
\ No newline at end of file
+    html = html or ""
+    text_len = count_visible_chars(_TAG_RE.sub("", html))
+    script_count = len(_SCRIPT_RE.findall(html))
+    return looks_client_rendered(text_len, script_count, html)
+
+
+def load_json(text: str) -> Any:
+    # orjson is strict: it rejects NaN/Infinity and loses precision on
+    # integers past 64 bits. Fall back to the stdlib parser for those.
+    if not _BIG_INT_RE.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+# robots.txt directives that never carry a path rule. Parsers such as
+# Protego accept misspellings and "field value" lines without a colon, so
+# anything not listed here or in _ROBOTS_PATH_FIELDS is treated as unknown.
+_ROBOTS_NON_PATH_FIELDS = {
+    "user-agent",
+    "useragent",
+    "user agent",
+    "sitemap",
+    "sitemaps",
+    "site-map",
+    "crawl-delay",
+    "crawl delay",
+    "request-rate",
+    "request rate",
+    "visit-time",
+    "visit time",
+    "host",
+}
+_ROBOTS_PATH_FIELDS = {"allow", "disallow"}
+
+
+def _split_robots_line(line: str) -> Optional[Tuple[str, str]]:
+    field, sep, value = line.partition(":")
+    if sep:
+        return field.strip().lower(), value.strip()
+    # "Disallow /x" / "User agent foo" style lines without a colon
+    words = line.split(None, 2)
+    for n in (2, 1):
+        field = " ".join(words[:n]).lower()
+        if len(words) >= n and (field in _ROBOTS_NON_PATH_FIELDS or field in _ROBOTS_PATH_FIELDS):
+            return field, " ".join(words[n:])
+    return None
+
+
+def robots_rule_prefix_len(robots_txt: str) -> Optional[int]:
+    # How much of a URL path can affect a can_fetch decision: the longest
+    # Allow/Disallow value in UTF-8 bytes, times 3 since each byte can be
+    # percent-encoded in the URL. None (don't cache) when a rule uses "$"
+    # or an inner "*", or when a line isn't a directive we can classify.
+    longest = 0
+    for line in robots_txt.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parsed = _split_robots_line(line)
+        if parsed is None:
+            return None
+        field, value = parsed
+        if field in _ROBOTS_NON_PATH_FIELDS:
+            continue
+        if field not in _ROBOTS_PATH_FIELDS:
+            return None
+        if "$" in value or "*" in value.rstrip("*"):
+            return None
+        longest = max(longest, len(value.encode("utf-8")))
+    return longest * 3 + 1